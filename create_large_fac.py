@@ -0,0 +1,62 @@
+"""
+Generate large .fac test files for benchmarking the readers.
+
+Produces the space-separated .fac layout the readers expect:
+- 1 header line
+- num_rows data lines (index column + value columns)
+- 10 footer metadata lines (##END##, ##COLOR##, etc.)
+"""
+
+import numpy as np
+
+FOOTER_LINES = [
+    "##END##",
+    "##COLOR####ENDCOLOR##",
+    "##FORMULA####ENDFORMULA##",
+    "##NOTES####ENDNOTES##",
+    "##USEROWDEFAULTVALUE####ENDUSEROWDEFAULTVALUE##",
+    "##ROWDEFAULTVALUE####ENDROWDEFAULTVALUE##",
+    "##GENERIC##VAR_NAME##ENDGENERIC##",
+    "##SCENARIO####ENDSCENARIO##",
+    "##UNITS####ENDUNITS##",
+    "##CHECKSUM####ENDCHECKSUM##",
+]
+
+
+def create_large_fac_file(output_path, num_rows=5000, num_cols=5, seed=None,
+                          chunk_rows=65536):
+    """
+    Create a .fac file filled with random data for benchmarking.
+
+    Parameters:
+    output_path (str): Path to save the generated file
+    num_rows (int): Number of data rows to generate
+    num_cols (int): Number of value columns per row
+    seed (int): Optional RNG seed for reproducible files
+    chunk_rows (int): Rows formatted per write call
+
+    Data is generated in vectorized blocks of chunk_rows and each block
+    is written with a single f.write, so Python-level write calls stay
+    O(num_rows / chunk_rows) instead of one per row, and memory stays
+    bounded for very large files.
+    """
+    rng = np.random.default_rng(seed)
+    header = '!' + ' '.join(['INDEX'] + [f'VALUE_{i + 1}' for i in range(num_cols)])
+
+    with open(output_path, 'w') as f:
+        f.write(header + '\n')
+        for start in range(0, num_rows, chunk_rows):
+            n = min(chunk_rows, num_rows - start)
+            data = np.round(rng.random((n, num_cols)) * 100, 2)
+            body = '\n'.join(
+                str(i) + ' ' + ' '.join(map(str, row))
+                for i, row in zip(range(start, start + n), data.tolist())
+            )
+            f.write(body + '\n')
+        f.write('\n'.join(FOOTER_LINES) + '\n')
+
+    print(f"Created {output_path} with {num_rows} rows x {num_cols} columns")
+
+
+if __name__ == "__main__":
+    create_large_fac_file('large_test.fac', num_rows=5000)
@@ -6,34 +6,91 @@ Processes .fac files to add CHANNEL_TI rows for files with CHANNEL and PRODUCT c
 
 import pandas as pd
 import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
 from fac_reader import read_fac_file_complete, write_fac_file
 
-def has_required_columns(filename):
-    """Check if file has both CHANNEL and PRODUCT columns"""
+def _iter_suffix_files(root, suffix):
+    """
+    Yield paths under root whose names end with suffix.
+
+    Uses os.scandir so directory-vs-file checks come from the cached
+    dirent data instead of a stat per entry, which os.walk pays to build
+    its full dirs/files lists.
+    """
     try:
-        fac_data = read_fac_file_complete(filename)
-        if not fac_data:
-            return False
-        
-        df = fac_to_dataframe(fac_data)
-        if df is None:
-            return False
-        
-        has_channel = False
-        has_product = False
-        
-        for col in df.columns:
-            col_upper = str(col).upper()
-            if 'CHANNEL' in col_upper:
-                has_channel = True
-            if ('PROD' in col_upper and 'NAME' in col_upper) or col_upper in ['PRODUCT', 'PROD_NAME', 'LOB_CODE']:
-                has_product = True
-        
-        return has_channel and has_product
-        
+        with os.scandir(root) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from _iter_suffix_files(entry.path, suffix)
+                elif entry.name.endswith(suffix):
+                    yield entry.path
+    except OSError:
+        return
+
+def iter_fac_files(root):
+    """Yield every .fac file path under root"""
+    yield from _iter_suffix_files(root, '.fac')
+
+@lru_cache(maxsize=256)
+def _roles_for_columns(cols_tuple):
+    """
+    Locate the channel and product columns by header name. Uppercases
+    each name once; returns (channel_col, prod_name_col) indices with
+    None for roles that are missing.
+
+    Batches share a handful of schemas, so memoizing on the tuple of
+    column names turns the string work into a dict lookup after the
+    first file of each schema.
+    """
+    channel_col = None
+    prod_name_col = None
+
+    for i, col in enumerate(cols_tuple):
+        col_upper = col.upper()
+        if 'CHANNEL' in col_upper:
+            channel_col = i
+        if ('PROD' in col_upper and 'NAME' in col_upper) or col_upper in ['PRODUCT', 'PROD_NAME', 'LOB_CODE']:
+            prod_name_col = i
+
+    return channel_col, prod_name_col
+
+def _detect_roles(columns):
+    """Hashable-tuple wrapper over the memoized role lookup"""
+    return _roles_for_columns(tuple(str(col) for col in columns))
+
+def _peek_header(path):
+    """
+    Return the first '!'-prefixed header line of a .fac file, or None.
+
+    Stops reading at the first data row, so checking a file's columns
+    costs O(header) I/O instead of a full parse of data and footers.
+    """
+    try:
+        with open(path, 'r') as file:
+            for line in file:
+                stripped = line.strip()
+                if not stripped:
+                    continue
+                if stripped.startswith('!') and ',' in stripped:
+                    return stripped
+                if stripped.startswith('*'):
+                    return None
+        return None
     except Exception:
+        return None
+
+def has_required_columns(filename):
+    """Check if file has both CHANNEL and PRODUCT columns"""
+    header = _peek_header(filename)
+    if header is None:
         return False
 
+    # Same split fac_to_dataframe applies to the header line
+    column_names = [col.strip() for col in header[1:].split(',')]
+    channel_col, prod_name_col = _detect_roles(column_names)
+    return channel_col is not None and prod_name_col is not None
+
 def fac_to_dataframe(fac_data):
     """Convert .fac data to pandas DataFrame"""
     if not fac_data:
@@ -59,156 +116,180 @@ def fac_to_dataframe(fac_data):
         clean_data.append(clean_row[:len(column_names)])
     
     df = pd.DataFrame(clean_data, columns=column_names)
+
+    # Channel/product codes repeat heavily, so low-cardinality columns
+    # are stored as category: the dedup downstream then hashes small
+    # integer codes instead of Python strings, and memory shrinks with
+    # them. Positional isetitem keeps this safe under duplicate labels.
+    for i in range(df.shape[1]):
+        series = df.iloc[:, i]
+        if series.nunique() < len(df) // 2:
+            df.isetitem(i, series.astype('category'))
+
     return df
 
 def dataframe_to_fac(df, original_headers, original_footers):
     """Convert DataFrame back to .fac format"""
     headers = original_headers.copy()
     
-    data_rows = []
-    for _, row in df.iterrows():
-        fac_row = ['*'] + row.tolist()
-        data_rows.append(fac_row)
-    
+    # One C-level conversion of the whole frame; iterrows would build a
+    # Series per row
+    data_rows = [['*', *row] for row in df.to_numpy().tolist()]
+
     footers = original_footers.copy()
     return headers, data_rows, footers
 
+def _df_add_channel_rows(df, new_agent, roles=None):
+    """Add new channel rows to an already-parsed DataFrame"""
+    try:
+        if df is None:
+            return None
+
+        channel_col, prod_name_col = roles if roles is not None else _detect_roles(df.columns)
+        if channel_col is None or prod_name_col is None:
+            return None
+
+        # One vectorized dedup + concat: rows that are unique ignoring the
+        # channel column each spawn one new row carrying the new agent.
+        # The hashed duplicated() mask and positional iloc write keep this
+        # correct even when column labels repeat.
+        key_cols = [c for i, c in enumerate(df.columns) if i != channel_col]
+
+        new_rows = df.loc[~df.duplicated(subset=key_cols, keep='first')].copy()
+
+        # A categorical channel column rejects values outside its
+        # categories, so widen it back to object before the overwrite
+        if isinstance(new_rows.dtypes.iloc[channel_col], pd.CategoricalDtype):
+            new_rows.isetitem(channel_col, new_rows.iloc[:, channel_col].astype(object))
+        new_rows.iloc[:, channel_col] = new_agent
+
+        return pd.concat([df, new_rows], ignore_index=True)
+
+    except Exception:
+        return None
+
 def add_channel_rows(filename, new_agent):
     """Add new channel rows to the file data"""
     try:
-        if not has_required_columns(filename):
-            return None
-        
         fac_data = read_fac_file_complete(filename)
         if not fac_data:
             return None
-        
-        df = fac_to_dataframe(fac_data)
-        if df is None:
-            return None
-        
-        channel_col = None
-        prod_name_col = None
-        
-        for i, col in enumerate(df.columns):
-            col_upper = str(col).upper()
-            if 'CHANNEL' in col_upper:
-                channel_col = i
-            if ('PROD' in col_upper and 'NAME' in col_upper) or col_upper in ['PRODUCT', 'PROD_NAME', 'LOB_CODE']:
-                prod_name_col = i
-        
-        if channel_col is None or prod_name_col is None:
-            return None
-        
-        processed_combinations = []
-        
-        for _, row in df.iterrows():
-            prod_name = row.iloc[prod_name_col]
-            row_values = [row.iloc[i] for i in range(len(row)) if i != channel_col]
-            combination_key = (prod_name, tuple(row_values))
-            
-            if combination_key not in processed_combinations:
-                processed_combinations.append(combination_key)
-                new_row = row.copy()
-                new_row.iloc[channel_col] = new_agent
-                df = pd.concat([df, new_row.to_frame().T], ignore_index=True)
-        
-        return df
-        
+
+        return _df_add_channel_rows(fac_to_dataframe(fac_data), new_agent)
+
     except Exception:
         return None
 
-def process_single_file(input_file, new_agent):
-    """Process a single .fac file in place"""
+def scan_fac_files(input_path):
+    """
+    Walk a path once and check each .fac file's header for the required
+    columns.
+
+    Returns a list of (file_path, eligible) tuples. The check reads only
+    the header line, so the single full parse of each file happens later
+    inside the processing workers.
+    """
+    if input_path.endswith('.fac'):
+        fac_paths = [input_path] if os.path.exists(input_path) else []
+    else:
+        fac_paths = list(iter_fac_files(input_path)) if os.path.exists(input_path) else []
+
+    return [(file_path, has_required_columns(file_path))
+            for file_path in fac_paths]
+
+def _process_parsed(input_file, fac_data, df, new_agent):
+    """Process one .fac file in place from its already-parsed data"""
     try:
-        if not has_required_columns(input_file):
+        if not fac_data or df is None:
             return None
-        
-        original_fac_data = read_fac_file_complete(input_file)
-        if not original_fac_data:
-            return False
-        
-        headers, _, footers = original_fac_data
-        modified_df = add_channel_rows(input_file, new_agent)
+
+        # Detect the column roles once; the check and the insertion below
+        # both reuse them
+        roles = _detect_roles(df.columns)
+        if roles[0] is None or roles[1] is None:
+            return None
+
+        headers, _, footers = fac_data
+        modified_df = _df_add_channel_rows(df, new_agent, roles)
         if modified_df is None:
             return False
-        
-        # Create backup
-        backup_file = input_file + '.backup'
-        if os.path.exists(input_file):
-            os.rename(input_file, backup_file)
-        
+
+        # Stage the new content in a temp file next to the original and
+        # swap it in with one atomic os.replace. The original is never in
+        # a missing/half-written state, and no .backup file is left to
+        # clean up afterwards.
+        tmp_file = input_file + '.tmp'
         try:
             new_headers, new_data_rows, new_footers = dataframe_to_fac(modified_df, headers, footers)
-            write_fac_file(input_file, new_headers, new_data_rows, new_footers)
-            
-            if os.path.exists(input_file):
-                if os.path.exists(backup_file):
-                    os.remove(backup_file)
-                return True
-            else:
-                if os.path.exists(backup_file):
-                    os.rename(backup_file, input_file)
-                return False
-                
+            write_fac_file(tmp_file, new_headers, new_data_rows, new_footers)
+            os.replace(tmp_file, input_file)
+            return True
+
         except Exception:
-            if os.path.exists(backup_file):
-                os.rename(backup_file, input_file)
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
             return False
-            
+
+    except Exception:
+        return False
+
+def process_single_file(input_file, new_agent):
+    """Process a single .fac file in place"""
+    try:
+        fac_data = read_fac_file_complete(input_file)
+        if not fac_data:
+            return None
+
+        return _process_parsed(input_file, fac_data, fac_to_dataframe(fac_data), new_agent)
+
     except Exception:
         return False
 
-def process_files(input_path, new_agent):
-    """Process files or folder in place"""
+def process_files(scanned, new_agent):
+    """Process pre-scanned files in place (see scan_fac_files)"""
     try:
         results = {'successful': 0, 'failed': 0, 'skipped': 0}
-        
-        if input_path.endswith('.fac'):
-            if os.path.exists(input_path):
-                result = process_single_file(input_path, new_agent)
-                if result is True:
-                    results['successful'] += 1
-                elif result is False:
-                    results['failed'] += 1
-                else:
-                    results['skipped'] += 1
-            else:
+
+        # The scan only peeked at headers, so the worker's parse is the
+        # one full parse each file gets
+        file_paths = [file_path for file_path, _ in scanned]
+
+        outcomes = None
+        if len(file_paths) > 1:
+            # Each file is an independent read -> transform -> write
+            # pipeline, so fan the batch out across cores. Workers get
+            # just the path, which keeps the task payload tiny and
+            # parallelizes the parsing as well.
+            try:
+                workers = min(os.cpu_count() or 1, len(file_paths))
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    outcomes = list(pool.map(
+                        partial(process_single_file, new_agent=new_agent),
+                        file_paths))
+            except Exception:
+                outcomes = None  # pool unavailable - fall through to serial
+
+        if outcomes is None:
+            outcomes = [process_single_file(file_path, new_agent)
+                        for file_path in file_paths]
+
+        for result in outcomes:
+            if result is True:
+                results['successful'] += 1
+            elif result is False:
                 results['failed'] += 1
-        else:
-            if not os.path.exists(input_path):
-                return results
-            
-            fac_files = []
-            for root, dirs, files in os.walk(input_path):
-                for file in files:
-                    if file.endswith('.fac'):
-                        file_path = os.path.join(root, file)
-                        fac_files.append(file_path)
-            
-            for file_path in fac_files:
-                result = process_single_file(file_path, new_agent)
-                if result is True:
-                    results['successful'] += 1
-                elif result is False:
-                    results['failed'] += 1
-                else:
-                    results['skipped'] += 1
-        
+            else:
+                results['skipped'] += 1
+
         return results
-        
+
     except Exception:
         return {'successful': 0, 'failed': 1, 'skipped': 0}
 
 def restore_backups(directory):
     """Restore all backup files in directory"""
-    backup_files = []
-    for root, dirs, files in os.walk(directory):
-        for file in files:
-            if file.endswith('.backup'):
-                backup_path = os.path.join(root, file)
-                original_path = backup_path[:-7]
-                backup_files.append((backup_path, original_path))
+    backup_files = [(backup_path, backup_path[:-7])
+                    for backup_path in _iter_suffix_files(directory, '.backup')]
     
     if not backup_files:
         return False
@@ -225,13 +306,11 @@ def restore_backups(directory):
 
 def cleanup_backups(directory):
     """Remove all backup files in directory"""
-    for root, dirs, files in os.walk(directory):
-        for file in files:
-            if file.endswith('.backup'):
-                try:
-                    os.remove(os.path.join(root, file))
-                except Exception:
-                    continue
+    for backup_path in _iter_suffix_files(directory, '.backup'):
+        try:
+            os.remove(backup_path)
+        except Exception:
+            continue
 
 def main():
     """Main processing function"""
@@ -256,17 +335,12 @@ def main():
     if not new_agent:
         new_agent = "CHANNEL_TI"
     
-    # Count files that will be processed
-    valid_files = 0
-    total_files = 0
-    for root, dirs, files in os.walk(input_path):
-        for file in files:
-            if file.endswith('.fac'):
-                total_files += 1
-                file_path = os.path.join(root, file)
-                if has_required_columns(file_path):
-                    valid_files += 1
-    
+    # One walk + one header check per file; the same scan feeds the
+    # count display and the processing pass below
+    scanned = scan_fac_files(input_path)
+    total_files = len(scanned)
+    valid_files = sum(1 for _, eligible in scanned if eligible)
+
     print(f"Found {total_files} .fac files total")
     print(f"{valid_files} files will be processed")
     print(f"{total_files - valid_files} files will be skipped")
@@ -282,7 +356,7 @@ def main():
         return
     
     # Process files
-    results = process_files(input_path, new_agent)
+    results = process_files(scanned, new_agent)
     
     print(f"\nResults:")
     print(f"  Successfully processed: {results['successful']} files")
@@ -335,23 +409,11 @@ if __name__ == "__main__":
             print(f"Input path: {input_path}")
             print(f"Agent: {new_agent}")
             
-            # Count files and process
-            valid_files = 0
-            total_files = 0
-            
-            if input_path.endswith('.fac'):
-                total_files = 1
-                if has_required_columns(input_path):
-                    valid_files = 1
-            else:
-                for root, dirs, files in os.walk(input_path):
-                    for file in files:
-                        if file.endswith('.fac'):
-                            total_files += 1
-                            file_path = os.path.join(root, file)
-                            if has_required_columns(file_path):
-                                valid_files += 1
-            
+            # Count files and process from a single walk + header pass
+            scanned = scan_fac_files(input_path)
+            total_files = len(scanned)
+            valid_files = sum(1 for _, eligible in scanned if eligible)
+
             print(f"\nFound {total_files} .fac files total")
             print(f"{valid_files} files will be processed")
             print(f"{total_files - valid_files} files will be skipped")
@@ -365,7 +427,7 @@ if __name__ == "__main__":
                 print("Operation cancelled.")
                 exit(0)
             
-            results = process_files(input_path, new_agent)
+            results = process_files(scanned, new_agent)
             
             print(f"\nResults:")
             print(f"  Successfully processed: {results['successful']} files")
@@ -1,10 +1,45 @@
+import asyncio
+import mmap
 import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from io import BytesIO, StringIO
 import numpy as np
 import pandas as pd
 from pathlib import Path
 from typing import List, Dict, Union
 
-def read_fac_file_smart(file_path, force_method=None):
+try:
+    import pyarrow.csv as pa_csv
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+try:
+    import aiofiles
+    HAS_AIOFILES = True
+except ImportError:
+    HAS_AIOFILES = False
+
+# Parsed results keyed by (abs path, mtime_ns, size): unchanged files
+# skip the read and parse entirely on repeat loads within a run
+_FAC_CACHE = {}
+
+# Batch size at which read_fac_files switches from threads to worker
+# processes; below this, process startup costs more than it saves
+_PROCESS_POOL_MIN_FILES = 16
+
+
+def _fac_cache_key(file_path):
+    """Cache key that changes whenever the file on disk does"""
+    try:
+        stat = os.stat(file_path)
+        return (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        return None
+
+
+def read_fac_file_smart(file_path, force_method=None, content=None):
     """
     Smart .fac file reader that automatically chooses the optimal method
     based on file size for best performance
@@ -15,52 +50,99 @@ def read_fac_file_smart(file_path, force_method=None):
     Args:
         file_path (str): Path to the .fac file
         force_method (str): Force specific method ('pandas' or 'manual')
-        
+        content (bytes): Already-loaded file bytes; skips the disk read
+
     Returns:
         list: List of numpy arrays, where each array represents a row
     """
 
-    def count_data_rows(file_path):
-        """Quick count of data rows without loading full file"""
+    def _load_and_index(file_path):
+        """
+        Load the file bytes and count data rows in one mmap scan.
+
+        Returns (buffer, n_data_rows); buffer is None when the file
+        cannot be read, and both parsers then fall back to reading the
+        path themselves. Row counting is one C memchr sweep over the
+        mapped bytes instead of decoding the file into lines.
+        """
         try:
-            with open(file_path, 'r') as f:
-                total_lines = sum(1 for _ in f)
-            return max(0, total_lines - 11)
+            with open(file_path, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    buffer = mm.read()
+            total_lines = buffer.count(b'\n')
+            if not buffer.endswith(b'\n'):
+                total_lines += 1
+            return buffer, max(0, total_lines - 11)
         except:
-            return 0
+            return None, 0
     
-    def read_fac_manual(file_path):
+    def read_fac_manual(file_path, content=None):
         """Manual method - optimal for small files (< 150 rows)"""
         try:
-            result = []
-            with open(file_path, 'r') as file:
-                lines = file.readlines()
-            
-            # Find where data starts and ends
-            data_start = -1
-            data_end = len(lines)
-            
-            for i, line in enumerate(lines):
-                # Look for header line starting with !
-                if line.strip().startswith('!'):
-                    data_start = i + 1
-                    break
-            
-            # Look for end markers
-            for i, line in enumerate(lines):
-                if '##END##' in line or line.strip() == '':
-                    data_end = i
-                    break
-            
-            if data_start == -1:
+            # The header flag and the ##END##/blank-line break reproduce
+            # the old start/end scan in a single lazy pass, so only the
+            # data lines themselves are kept
+            def gather(line_iter):
+                data_lines = []
+                found_header = False
+                for raw_line in line_iter:
+                    if '##END##' in raw_line or raw_line.strip() == '':
+                        break
+
+                    if not found_header:
+                        # Look for header line starting with !
+                        if raw_line.strip().startswith('!'):
+                            found_header = True
+                        continue
+
+                    line = raw_line.strip()
+                    if not line or line.startswith('#'):
+                        continue
+                    data_lines.append(line)
+                return data_lines, found_header
+
+            if content is not None:
+                # Buffer already loaded by _load_and_index
+                data_lines, found_header = gather(content.decode(errors='replace').splitlines())
+            else:
+                # Stream the file line by line instead of readlines()
+                with open(file_path, 'r') as file:
+                    data_lines, found_header = gather(file)
+
+            if not found_header:
                 return None
-            
-            # Process data lines
-            for line_idx in range(data_start, min(data_end, len(lines))):
-                line = lines[line_idx].strip()
-                if not line or line.startswith('#'):
-                    continue
-                
+            if not data_lines:
+                return []
+
+            # Fully numeric files parse in a single np.loadtxt call - one
+            # C tokenizer pass instead of a Python float() per token.
+            # Mixed-type rows raise ValueError and drop to the per-line
+            # loop below
+            try:
+                if data_lines[0].startswith('*,'):
+                    arr = np.loadtxt([l[2:] for l in data_lines if l.startswith('*,')],
+                                     delimiter=',', dtype=np.float64, ndmin=2)
+                elif ',' in data_lines[0]:
+                    arr = np.loadtxt(data_lines, delimiter=',', dtype=np.float64,
+                                     ndmin=2, max_rows=len(data_lines))
+                else:
+                    # Skip the leading index column, as the row loop
+                    # does; usecols plus the known row count give
+                    # loadtxt the full output shape up front
+                    ncols = len(data_lines[0].split())
+                    arr = np.loadtxt(data_lines, dtype=np.float64,
+                                     usecols=range(1, ncols), ndmin=2,
+                                     max_rows=len(data_lines))
+                # 2-D ndarray: rows stay views into one contiguous buffer
+                return arr
+            except ValueError:
+                pass
+
+            # Pre-size the result to the known line count and trim once
+            # at the end, instead of growing the list append by append
+            result = [None] * len(data_lines)
+            count = 0
+            for line in data_lines:
                 # Handle different row formats
                 if line.startswith('*,'):
                     # Format: *,"product_name",value1,value2,...
@@ -77,59 +159,143 @@ def read_fac_file_smart(file_path, force_method=None):
                                 except ValueError:
                                     cleaned_data.append(item)
                         if cleaned_data:
-                            result.append(np.array(cleaned_data))
+                            result[count] = np.array(cleaned_data)
+                            count += 1
                 else:
                     # Standard format: value1,value2,value3,... or space-separated
-                    # Try comma-separated first, then space-separated
+                    # np.fromstring parses the row in C and raises
+                    # ValueError on non-numeric tokens, replacing the
+                    # split + float()-per-token loop; the string path
+                    # below is the same fallback as before
                     if ',' in line:
-                        row_data = [x.strip() for x in line.split(',') if x.strip()]
+                        try:
+                            row_array = np.fromstring(line, dtype=np.float64, sep=',')
+                        except ValueError:
+                            row_array = np.array([x.strip() for x in line.split(',') if x.strip()])
                     else:
-                        row_data = line.split()[1:] if len(line.split()) > 1 else line.split()
-                    
-                    if row_data:
                         try:
-                            row_array = np.array([float(x) for x in row_data])
+                            values = np.fromstring(line, dtype=np.float64, sep=' ')
+                            # Drop the leading index column, as split()[1:] did
+                            row_array = values[1:] if values.size > 1 else values
                         except ValueError:
-                            row_array = np.array(row_data)
-                        result.append(row_array)
-            
-            return result
+                            parts = line.split()
+                            row_array = np.array(parts[1:] if len(parts) > 1 else parts)
+
+                    if row_array.size:
+                        result[count] = row_array
+                        count += 1
+
+            return result[:count]
         except Exception:
             return None
     
-    def read_fac_pandas(file_path):
+    def read_fac_pandas(file_path, content=None):
         """Pandas method - optimal for large files (>= 150 rows)"""
         try:
-            with open(file_path, 'r') as f:
-                content = f.read()
-            
+            if content is None:
+                with open(file_path, 'rb') as f:
+                    content = f.read()
+
             # Check if file uses *-format (star comma format)
-            if '*,' in content:
-                return _parse_star_format(content.splitlines())
-            
-            # Use standard pandas approach for space-separated format
-            df = pd.read_csv(file_path, sep=r'\s+', skiprows=1, header=None)
-            filtered_df = df.iloc[:-10, 1:]
+            if b'*,' in content:
+                return _parse_star_format(content.decode(errors='replace').splitlines())
+
+            # Use pyarrow's multithreaded CSV reader when available: the
+            # regex separator forces pandas onto its Python engine, while
+            # arrow parses space-delimited numerics in parallel C++
+            df = None
+            trimmed = False
+            # Both fast parsers need the 10 footer lines gone first:
+            # arrow's strict column-count check rejects '##END##'
+            # outright (after parsing the whole body), and the C engine
+            # needs every remaining field numeric for its fixed dtype
+            body = content.rstrip(b'\n').rsplit(b'\n', 10)[0]
+            if HAS_PYARROW:
+                try:
+                    table = pa_csv.read_csv(
+                        BytesIO(body),
+                        read_options=pa_csv.ReadOptions(
+                            skip_rows=1, autogenerate_column_names=True,
+                            use_threads=True),
+                        parse_options=pa_csv.ParseOptions(delimiter=' '))
+                    # Arrow has no usecols; drop the index column after
+                    # the parallel parse
+                    df = table.to_pandas().iloc[:, 1:]
+                    trimmed = True
+                except Exception:
+                    df = None
+
+            if df is None:
+                # C-engine fast path: with the footer already off, parse
+                # with a literal separator and fixed dtype - no regex
+                # tokenizer, no dtype inference, no NA scan. Ragged or
+                # mixed files raise and fall back to the permissive
+                # whitespace parse
+                try:
+                    # Column count from the first data line: usecols
+                    # then skips the index column at parse time instead
+                    # of slicing it off afterwards
+                    sample = body.split(b'\n', 2)
+                    ncols = len(sample[1].split()) if len(sample) > 1 else 0
+                    df = pd.read_csv(BytesIO(body), sep=' ', skiprows=1,
+                                     header=None, dtype=np.float64,
+                                     engine='c', na_filter=False,
+                                     usecols=range(1, ncols))
+                    trimmed = True
+                except (ValueError, TypeError):
+                    df = pd.read_csv(BytesIO(content), sep=r'\s+', skiprows=1, header=None)
+
+            filtered_df = df if trimmed else df.iloc[:-10, 1:]
             numpy_array = filtered_df.to_numpy()
             
             try:
                 numpy_array = numpy_array.astype(float)
             except ValueError:
                 pass
-            
-            return [row for row in numpy_array]
+
+            # Return the 2-D array as-is: a list comprehension here would
+            # allocate one view object per row for callers that only
+            # index and iterate
+            return numpy_array
         except Exception:
             return None
     
     def _parse_star_format(lines):
         """Helper function to parse *-format lines"""
+        star_lines = [stripped[2:] for stripped in (line.strip() for line in lines)
+                      if stripped.startswith('*,')]
+        if not star_lines:
+            return []
+
+        # Bulk path: tokenize every row in one C-engine read_csv call and
+        # coerce numerics column-wise instead of split + float() per
+        # token. Ragged files raise and fall back to the per-line loop.
+        try:
+            df = pd.read_csv(StringIO('\n'.join(star_lines)), sep=',',
+                             header=None, engine='c', quotechar='"',
+                             dtype=str, na_filter=False)
+
+            # Drop all-empty columns (trailing commas), as the per-token
+            # cleaner dropped empty fields
+            keep = [i for i in range(df.shape[1])
+                    if not (df.iloc[:, i].str.strip() == '').all()]
+            df = df.iloc[:, keep]
+
+            for i in range(df.shape[1]):
+                stripped_col = df.iloc[:, i].str.strip().str.strip('"').str.strip()
+                numeric = pd.to_numeric(stripped_col, errors='coerce')
+                if numeric.notna().any():
+                    df.isetitem(i, numeric.where(numeric.notna(), stripped_col.astype(object)))
+                else:
+                    df.isetitem(i, stripped_col)
+
+            return df.to_numpy()
+        except Exception:
+            pass
+
         result = []
-        for line in lines:
-            line = line.strip()
-            if not line.startswith('*,'):
-                continue
-                
-            parts = line.split(',')[1:]  # Skip the '*'
+        for line in star_lines:
+            parts = line.split(',')
             cleaned_data = []
             for item in parts:
                 item = item.strip().strip('"').strip()
@@ -138,22 +304,54 @@ def read_fac_file_smart(file_path, force_method=None):
                         cleaned_data.append(float(item))
                     except ValueError:
                         cleaned_data.append(item)
-            
+
             if cleaned_data:
                 result.append(np.array(cleaned_data))
         return result
     
     if force_method == 'pandas':
-        return read_fac_pandas(file_path)
+        return read_fac_pandas(file_path, content=content)
     elif force_method == 'manual':
-        return read_fac_manual(file_path)
+        return read_fac_manual(file_path, content=content)
     else:
-        data_rows = count_data_rows(file_path)
-        
+        # Repeated pipeline runs hit the same unchanged files; the
+        # (path, mtime, size) key invalidates itself as soon as a file
+        # is rewritten
+        cache_key = _fac_cache_key(file_path)
+        if cache_key is not None and cache_key in _FAC_CACHE:
+            cached = _FAC_CACHE[cache_key]
+            if isinstance(cached, np.ndarray):
+                # Read-only view: a caller writing into the hit would
+                # otherwise poison every later read of the same file
+                view = cached.view()
+                view.flags.writeable = False
+                return view
+            return list(cached)
+
+        # One scan loads the buffer and counts the rows; the chosen
+        # parser then works on the already-loaded bytes instead of
+        # re-reading the file for a second full pass
+        if content is None:
+            buffer, data_rows = _load_and_index(file_path)
+        else:
+            buffer = content
+            total_lines = buffer.count(b'\n')
+            if not buffer.endswith(b'\n'):
+                total_lines += 1
+            data_rows = max(0, total_lines - 11)
+
         if data_rows < 150:
-            return read_fac_manual(file_path)
+            data = read_fac_manual(file_path, content=buffer)
         else:
-            return read_fac_pandas(file_path)
+            data = read_fac_pandas(file_path, content=buffer)
+
+        if cache_key is not None and data is not None:
+            if isinstance(data, np.ndarray):
+                # The entry doubles as the first caller's result, so
+                # freeze it at store time
+                data.flags.writeable = False
+            _FAC_CACHE[cache_key] = data
+        return data
 
 
 def read_fac_files(path: Union[str, Path]) -> Dict[str, List]:
@@ -180,23 +378,199 @@ def read_fac_files(path: Union[str, Path]) -> Dict[str, List]:
     
     elif path.is_dir():
         fac_files = list(path.rglob('*.fac'))
-        
-        for fac_file in fac_files:
+
+        def safe_read(fac_file):
             try:
-                data = read_fac_file_smart(str(fac_file))
-                if data is not None:
-                    results[str(fac_file)] = data
+                return read_fac_file_smart(fac_file)
             except Exception:
-                pass
-    
+                return None
+
+        file_names = [str(fac_file) for fac_file in fac_files]
+        parsed = None
+
+        if len(file_names) >= _PROCESS_POOL_MIN_FILES:
+            # Large batches are CPU-bound in the per-file Python
+            # orchestration even though the C parsers release the GIL,
+            # so they go to worker processes; read_fac_file_smart is a
+            # top-level function, so it pickles cleanly
+            try:
+                with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+                    parsed = list(ex.map(read_fac_file_smart, file_names))
+            except Exception:
+                parsed = None  # pool unavailable - fall through to threads
+
+        if parsed is None and len(file_names) > 1:
+            # Each file is independent I/O plus C-level parsing that
+            # releases the GIL, so reading them concurrently overlaps
+            # the disk waits; map() keeps rglob order in the dict
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as ex:
+                parsed = list(ex.map(safe_read, file_names))
+
+        if parsed is None:
+            parsed = [safe_read(file_name) for file_name in file_names]
+
+        for file_name, data in zip(file_names, parsed):
+            if data is not None:
+                results[file_name] = data
+
     return results
 
 
-def Check_Column_Channel_Product(Data, data_address) -> Union[None, List,int]:
+def read_fac_file_memmap(file_path):
+    """
+    Read a .fac file through an .npy sidecar cache.
+
+    On the first call the file is parsed normally and, when the result
+    is a numeric 2-D array, saved next to the source as <file>.fac.npy.
+    Later runs np.load the sidecar with mmap_mode='r', so the parse cost
+    disappears and the OS pages the data in on demand; a newer source
+    file invalidates the sidecar by mtime. Non-numeric results are
+    returned uncached.
+    """
+    cache_path = file_path + '.npy'
+    try:
+        if os.path.getmtime(cache_path) >= os.path.getmtime(file_path):
+            return np.load(cache_path, mmap_mode='r')
+    except (OSError, ValueError):
+        pass
+
+    data = read_fac_file_smart(file_path)
+
+    if isinstance(data, np.ndarray) and data.dtype != object:
+        try:
+            np.save(cache_path, data)
+        except OSError:
+            pass
+
+    return data
+
+
+def iter_fac_files(path: Union[str, Path]):
+    """
+    Lazily yield (file_path, data) pairs for .fac files under a path.
+
+    Unlike read_fac_files, which holds every parsed file in one dict,
+    this keeps a single file's data alive at a time, so arbitrarily
+    large directory trees process in bounded memory. Files that fail to
+    parse are skipped, matching the dict-based reader.
+    """
+    path = Path(path)
+
+    if not path.exists():
+        return
+
+    if path.is_file():
+        if path.suffix.lower() == '.fac':
+            data = read_fac_file_smart(str(path))
+            if data is not None:
+                yield str(path), data
+        return
+
+    for fac_file in path.rglob('*.fac'):
+        try:
+            data = read_fac_file_smart(str(fac_file))
+        except Exception:
+            continue
+        if data is not None:
+            yield str(fac_file), data
+
+
+def read_fac_files_async(path: Union[str, Path], max_in_flight: int = 256) -> Dict[str, List]:
+    """
+    Asynchronous variant of read_fac_files for large cold directory scans.
+
+    Submits up to max_in_flight file reads concurrently (via aiofiles
+    when installed, otherwise asyncio's thread pool) so the kernel can
+    keep the device queue full, then parses the in-memory buffers with
+    the normal smart parser. Returns the same dict as read_fac_files;
+    non-directory paths fall through to the serial reader.
+    """
+    path = Path(path)
+    if not path.is_dir():
+        return read_fac_files(path)
+
+    fac_files = [str(fac_file) for fac_file in path.rglob('*.fac')]
+
+    async def load(file_name, sem):
+        async with sem:
+            if HAS_AIOFILES:
+                async with aiofiles.open(file_name, 'rb') as f:
+                    return await f.read()
+            return await asyncio.to_thread(Path(file_name).read_bytes)
+
+    async def load_all():
+        sem = asyncio.Semaphore(max_in_flight)
+        return await asyncio.gather(
+            *[load(file_name, sem) for file_name in fac_files],
+            return_exceptions=True)
+
+    results = {}
+    for file_name, buffer in zip(fac_files, asyncio.run(load_all())):
+        if isinstance(buffer, BaseException):
+            continue
+        try:
+            data = read_fac_file_smart(file_name, content=buffer)
+        except Exception:
+            data = None
+        if data is not None:
+            results[file_name] = data
+
+    return results
+
+
+@lru_cache(maxsize=256)
+def _read_header_line(file_path):
+    """
+    Return the stripped '!'-prefixed header line of a file, or None.
+
+    Stops reading at the header instead of loading the whole file, and
+    the lru_cache means repeat lookups for the same path cost nothing -
+    the upstream parsers have already read the file once by the time the
+    header is needed here.
+    """
+    try:
+        with open(file_path, 'r') as f:
+            for line in f:
+                stripped = line.strip()
+                if stripped.startswith('!'):
+                    return stripped
+        return None
+    except Exception:
+        return None
+
+
+def fac_has_columns(file_path, required=('channel', 'product')) -> bool:
+    """
+    Cheaply check whether a .fac header names all required columns.
+
+    Reads only up to the cached header line, so whole directories can be
+    filtered before paying for a full parse. 'product' also accepts
+    prod_name-style headers, mirroring Check_Column_Channel_Product.
+    """
+    header_line = _read_header_line(file_path)
+    if not header_line:
+        return False
+
+    names = {part.strip().strip('"').lower() for part in header_line.split(',')}
+    for wanted in required:
+        if wanted in names:
+            continue
+        if wanted == 'product' and any('prod_name' in name for name in names):
+            continue
+        return False
+    return True
+
+
+def Check_Column_Channel_Product(Data, data_address, header_line=None) -> Union[None, List,int]:
     """
     Add channel functionality to process .fac file data
+
+    header_line, when supplied by a caller that already parsed the file
+    (see parse_fac_complete), skips even the cached header lookup so the
+    source file is never touched again here.
     """
-    if not Data:
+    # len() instead of truthiness: Data may now be a 2-D ndarray
+    if Data is None or len(Data) == 0:
         print("No data to process")
         return
     
@@ -208,27 +582,47 @@ def Check_Column_Channel_Product(Data, data_address) -> Union[None, List,int]:
     product_address = None
     
     try:
-        # Read the original file to find the header line
-        with open(data_address, 'r') as f:
-            lines = f.readlines()
-        
-        header_line = None
-        for line in lines:
-            if line.strip().startswith('!'):
-                header_line = line.strip()
-                break
-        
+        # Header comes from the caller when available, else from the
+        # cached single-line read - never a second full pass over an
+        # already-parsed file
+        if header_line is None:
+            header_line = _read_header_line(data_address)
+
         if header_line:
-            # Parse header to find column positions
+            # Parse header into one name -> position dict; role lookups
+            # are then O(1) instead of a substring test per column, and
+            # the dict is easy to extend with more roles later
             header_parts = header_line.split(',')
-            for col_index, value in enumerate(header_parts):
-                if str(value).lower() == 'channel':
-                    channel_address = col_index - 1  # Adjust for the ! prefix
-                elif str(value).lower() == 'product' or 'prod_name' in str(value).lower():
-                    product_address = col_index - 1  # Adjust for the ! prefix
+            col_idx = {str(value).strip().strip('"').lower(): col_index
+                       for col_index, value in enumerate(header_parts)}
+
+            channel_idx = col_idx.get('channel')
+            product_idx = col_idx.get('product')
+            if product_idx is None:
+                product_idx = next((i for name, i in col_idx.items()
+                                    if 'prod_name' in name), None)
+
+            if channel_idx is not None:
+                channel_address = channel_idx - 1  # Adjust for the ! prefix
+            if product_idx is not None:
+                product_address = product_idx - 1  # Adjust for the ! prefix
         
         print(f"Found channel at column {channel_address}, product at column {product_address}")
         unique_products = []
+
+        if isinstance(Data, np.ndarray) and Data.ndim == 2:
+            # Bulk path: one np.unique over the product column replaces
+            # the per-row set lookups; np.sort(idx) keeps first-seen
+            # order like the loop below
+            # No product column: same (channel, None, []) result the
+            # list path produces, instead of comparing against None
+            if product_address is not None and Data.shape[1] > product_address:
+                keys = Data[:, product_address].astype(str)
+                _, idx = np.unique(keys, return_index=True)
+                unique_products = [Data[i, product_address:] for i in np.sort(idx)]
+            print(f"Found {len(unique_products)} unique products")
+            return channel_address, product_address, unique_products
+
         seen_products = set()
         for i, row in enumerate(Data):
             try:
@@ -240,12 +634,14 @@ def Check_Column_Channel_Product(Data, data_address) -> Union[None, List,int]:
                     if product_key not in seen_products:
                         seen_products.add(product_key)
                         unique_products.append(product_row)
-                        print(f"Row {i}: Found unique product: {product_key}")
 
             except Exception as e:
                 print(f"Error processing row {i}: {e}")
                 continue
 
+        # One summary line instead of a print per unique row; stdout
+        # formatting and flushing dominates the loop on large files
+        print(f"Found {len(unique_products)} unique products")
         return channel_address, product_address, unique_products
 
     except Exception as e:
@@ -254,29 +650,29 @@ def Check_Column_Channel_Product(Data, data_address) -> Union[None, List,int]:
 
 def extract_unique_products(unique_products, channel_address, newchannel) -> List:
     """
-    Extract unique products and create new channel entries with "*" prefix
+    Extract unique products and create new channel entries as
+    ready-to-write "*,"-prefixed lines
     """
     print(f"Unique products found: {len(unique_products)}")
-    print(len(unique_products))
     if unique_products:
         print("Sample unique products:")
         for i, product in enumerate(unique_products[:5]):  # Show first 5
             print(f"  {i+1}: {product}")
     
     new_lines = []
-    for i in unique_products:
+    for row in unique_products:
         try:
-            if len(i) > channel_address:
-                # Create a copy and modify the channel
-                product_copy = i.copy()
-                product_copy[channel_address] = newchannel
-                # Convert to list and add "*" as first element
-                new_line = ["*"] + product_copy.tolist()
-                new_lines.append(new_line)
+            if len(row) > channel_address:
+                # Format the line directly instead of the old
+                # copy -> mutate -> tolist round-trip; the writer can
+                # take these as-is with no further conversion
+                fields = [str(value) for value in row]
+                fields[channel_address] = newchannel
+                new_lines.append('*,' + ','.join(fields) + '\n')
         except Exception as e:
-            print(f"Error processing row {i}: {e}")
+            print(f"Error processing row {row}: {e}")
             continue
-    
+
     return new_lines
 
 
@@ -297,44 +693,101 @@ def extract_and_remove_bottom_lines(file_path):
             - header_lines: List of header lines before data starts
     """
     try:
-        with open(file_path, 'r') as f:
-            all_lines = f.readlines()
-        
-        # Find header end (line starting with !)
-        header_end = -1
-        for i, line in enumerate(all_lines):
-            if line.strip().startswith('!'):
-                header_end = i
-                break
-        
-        # Find where bottom metadata starts
-        bottom_start = len(all_lines)
-        for i in range(len(all_lines) - 1, -1, -1):
-            line = all_lines[i].strip()
-            if line.startswith('##') or line == '':
-                bottom_start = i
-            else:
-                break
-        
-        # Split the file into sections
-        header_lines = all_lines[:header_end + 1] if header_end >= 0 else []
-        data_lines = all_lines[header_end + 1:bottom_start] if header_end >= 0 else []
-        bottom_lines = all_lines[bottom_start:]
-        
+        with open(file_path, 'rb') as f:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty file cannot be mapped
+                return [], [], []
+
+            try:
+                size = len(mm)
+
+                # Find header end (line starting with !) with C-level
+                # byte searches instead of a Python loop over lines
+                if mm[:1] == b'!':
+                    header_pos = 0
+                else:
+                    idx = mm.find(b'\n!')
+                    header_pos = idx + 1 if idx != -1 else -1
+
+                header_end_off = 0
+                if header_pos != -1:
+                    nl = mm.find(b'\n', header_pos)
+                    header_end_off = size if nl == -1 else nl + 1
+
+                # Find where bottom metadata starts by walking lines
+                # backwards from the end; only the footer block is
+                # touched, not the data body
+                bottom_off = size
+                pos = size
+                while pos > 0:
+                    nl = mm.rfind(b'\n', 0, pos - 1)
+                    start = nl + 1
+                    stripped = mm[start:pos].strip()
+                    if stripped.startswith(b'##') or stripped == b'':
+                        bottom_off = start
+                        pos = start
+                    else:
+                        break
+
+                # Split the file into sections; only the needed byte
+                # ranges are decoded into line lists. Newlines are
+                # normalized like the text-mode read this replaced, so
+                # CRLF files round-trip with uniform '\n' endings
+                def decode_lines(raw):
+                    text = raw.decode().replace('\r\n', '\n').replace('\r', '\n')
+                    return text.splitlines(keepends=True)
+
+                if header_pos != -1:
+                    header_lines = decode_lines(mm[:header_end_off])
+                    data_lines = decode_lines(mm[header_end_off:bottom_off])
+                else:
+                    header_lines = []
+                    data_lines = []
+                bottom_lines = decode_lines(mm[bottom_off:])
+            finally:
+                mm.close()
+
         # Clean up data lines (remove empty lines and comments)
         clean_data_lines = []
         for line in data_lines:
             stripped = line.strip()
             if stripped and not stripped.startswith('#'):
                 clean_data_lines.append(line)
-        
+
         return clean_data_lines, bottom_lines, header_lines
-        
+
     except Exception as e:
         print(f"Error processing file {file_path}: {e}")
         return [], [], []
 
 
+def parse_fac_complete(file_path):
+    """
+    Read a .fac file once and return everything the pipeline needs.
+
+    Returns:
+        tuple: (data, sections)
+            - data: parsed row data as returned by read_fac_file_smart
+            - sections: the (data_lines, bottom_lines, header_lines)
+              tuple from extract_and_remove_bottom_lines, for writing
+
+    The parser runs on bytes reassembled from the already-read sections,
+    so the file is opened and read a single time for a full
+    read -> transform -> write cycle instead of once per stage.
+    """
+    sections = extract_and_remove_bottom_lines(file_path)
+    data_lines, bottom_lines, header_lines = sections
+
+    if not (header_lines or data_lines or bottom_lines):
+        return None, sections
+
+    content = ''.join(header_lines + data_lines + bottom_lines).encode()
+    data = read_fac_file_smart(file_path, content=content)
+    return data, sections
+
+
 def save_file_without_bottom(file_path, output_path=None):
     """
     Save a .fac file without the bottom metadata lines.
@@ -391,38 +844,49 @@ def restore_bottom_lines(file_path, bottom_lines):
         print(f"Error restoring bottom lines: {e}")
         return False
 
-def process_fac_with_bottom_management(file_path, modified_lines):
+def process_fac_with_bottom_management(file_path, modified_lines, sections=None):
     """
     Example of how to process a .fac file while properly managing bottom lines.
-    
+
     Args:
         file_path (str): Path to the .fac file
         new_channel_name (str): Name of new channel to add
-        
+        sections (tuple): Pre-extracted (data_lines, bottom_lines,
+            header_lines) from parse_fac_complete; skips the re-read
+
     Returns:
         bool: Success status
     """
     try:
         print(f"\n=== Processing {file_path} with Bottom Line Management ===")
-        
-        # Step 1: Extract components
-        data_lines, bottom_lines, header_lines = extract_and_remove_bottom_lines(file_path)
+
+        # Step 1: Extract components (reused from the initial parse when
+        # the caller already has them)
+        if sections is None:
+            sections = extract_and_remove_bottom_lines(file_path)
+        data_lines, bottom_lines, header_lines = sections
         print(f"Extracted {len(data_lines)} data lines and {len(bottom_lines)} bottom lines")
 
         
-        # Step 4: Write back with bottom lines
+        # Step 4: Assemble header + data + new channel entries + bottom
+        # in memory and write once, instead of a writelines call per
+        # section; this also actually emits the modified lines, which
+        # the old loop only printed
+        data_text = ''.join(data_lines)
+        if data_text and not data_text.endswith('\n'):
+            data_text += '\n'
+        new_channel_text = ''.join(
+            line if line.endswith('\n') else line + '\n'
+            for line in map(str, modified_lines))
+
+        buf = ''.join(header_lines) + data_text + new_channel_text + ''.join(bottom_lines)
         with open(file_path, 'w') as f:
-            # Write header
-            f.writelines(header_lines)
-            # Write modified data
-            print(f"Writing data lines: {data_lines}")
-            f.writelines(data_lines)
-            # Write modified lines (e.g., new channel entries)
-            for modified_line_row in modified_lines:
-                print(f"Adding modified line: {modified_line_row}")
-            # Write bottom lines
-            print(f"Restoring bottom lines: {bottom_lines}")
-            f.writelines(bottom_lines)
+            f.write(buf)
+
+        # Summary counts only - repr-ing the whole dataset into a print
+        # costs more than the write itself
+        print(f"Wrote {len(data_lines)} data lines, {len(modified_lines)} new channel lines, "
+              f"restored {len(bottom_lines)} bottom lines")
         
         print(f"File updated successfully with 'New channel' entries")
         return True
@@ -462,11 +926,24 @@ if __name__ == "__main__":
 
     # Always run normal file reading for comparison
     print("\n=== Normal File Reading ===")
-    folder_data = read_fac_files(r"Data\TABLE_II_May'25\IC_ADJ_PC.fac")
+    fac_path = r"Data\TABLE_II_May'25\IC_ADJ_PC.fac"
     newchannel = "This_Is_A_New_Channel"
 
-    for file_path, file_data in folder_data.items():
-        channel_address, product_address, unique_products = Check_Column_Channel_Product(file_data, file_path)
+    # Header-only pre-check: files without the needed columns are
+    # skipped before any full parse happens
+    if not fac_has_columns(fac_path):
+        print(f"Skipping {fac_path}: required columns not found")
+        file_data, sections = None, ([], [], [])
+    else:
+        # One read feeds both the parsed data and the raw sections used
+        # on the write side
+        file_data, sections = parse_fac_complete(fac_path)
+    if file_data is not None:
+        header_line = next((line.strip() for line in sections[2]
+                            if line.strip().startswith('!')), None)
+        channel_address, product_address, unique_products = Check_Column_Channel_Product(
+            file_data, fac_path, header_line=header_line)
         Unique_Lines= extract_unique_products(unique_products, channel_address, newchannel)
-        print(Unique_Lines)
-        process_fac_with_bottom_management(file_path, Unique_Lines)
+        # Count only - repr-ing every generated line scales with the data
+        print(f"Prepared {len(Unique_Lines)} new channel lines")
+        process_fac_with_bottom_management(fac_path, Unique_Lines, sections=sections)